@@ -18,11 +18,15 @@ class Macro:
 
     def Cottrell(self, t):
         i =  self.n*F*self.A*self.C*np.sqrt(self.D/(np.pi*t))
-        return i + np.random.normal(size=t.size, scale=self.noise)
+        if self.noise:
+            i = i + np.random.normal(size=t.size, scale=self.noise)
+        return i
 
     def RandlesSevcik(self, sr):
         i = 0.4463*self.n*F*self.A*self.C*np.sqrt(self.n*F*sr*self.D/(R*self.T))
-        return i + np.random.normal(size=sr.size, scale=self.noise)
+        if self.noise:
+            i = i + np.random.normal(size=sr.size, scale=self.noise)
+        return i
 
 
 
@@ -64,6 +68,14 @@ class MicroDisc:
         E:      V, potential for the step
         Returns:
         self.ca: A, numpy array with the currents calculated at times t
+    LSV_batch(E, k0s, alphas):
+        Parameters:
+        E:      V, numpy array to calculate the voltammograms
+        k0s:    cm/s, sequence of standard rate constants
+        alphas: sequence of transfer coefficients
+        Returns:
+        A, numpy array of shape (len(k0s)*len(alphas), E.size) with one
+        voltammogram per (k0, alpha) pair, alpha varying fastest
 
 
     ----------
@@ -115,40 +127,69 @@ class MicroDisc:
         self.iLim = n*F*self.A*self.m0*self.C
 
     def LSV(self, E):
-        kf = self.k0*np.exp(self.alphaf*self.n*self.FRT*(E-self.E0))
-        kb = self.k0*np.exp(self.alphab*self.n*self.FRT*(E-self.E0))
+        u = self.n*self.FRT*(E-self.E0) # adimensional overpotential
         if self.sign == -1:
-            self.k = kf
+            self.k = self.k0*np.exp(self.alphaf*u) # kf
         else:
-            self.k = kb
-        theta=1+self.DODR*np.exp(-self.sign*self.n*F*(E-self.E0)/(R*self.T))
+            self.k = self.k0*np.exp(self.alphab*u) # kb
+        theta=1+self.DODR*np.exp(-self.sign*u)
         kappa = np.pi*self.k*self.a/(4*self.D)
-        i = (self.iLim/theta)/(1 + 
-            (np.pi/(kappa*theta))*((2*kappa*theta+
-            3*np.pi)/(4*kappa*theta+3*np.pi**2)))
-        return i + np.random.normal(size=E.size, scale=self.noise)
+        kt = kappa*theta
+        i = (self.iLim/theta)/(1 + (np.pi/kt)*((2*kt + 3*np.pi)/(4*kt + 3*np.pi**2)))
+        if self.noise:
+            i = i + np.random.normal(size=E.size, scale=self.noise)
+        return i
+
+    def LSV_batch(self, E, k0s, alphas):
+        E = np.asarray(E, dtype=float)
+        u = self.n*self.FRT*(E-self.E0) # adimensional overpotential
+        theta = 1+self.DODR*np.exp(-self.sign*u)
+        # Broadcast over (k0, alpha, E), u and theta are shared by all pairs:
+        k0 = np.asarray(k0s, dtype=float)[:,None,None]
+        alpha = np.asarray(alphas, dtype=float)[None,:,None]
+        k = k0*np.exp(self.sign*alpha*u) # kf or kb, as in LSV
+        kappa = np.pi*k*self.a/(4*self.D)
+        kt = kappa*theta
+        i = (self.iLim/theta)/(1 + (np.pi/kt)*((2*kt + 3*np.pi)/(4*kt + 3*np.pi**2)))
+        i = i.reshape(-1, E.size)
+        if self.noise:
+            i = i + np.random.normal(size=i.shape, scale=self.noise)
+        return i
 
     def CA(self, t, E=-1):
         t = np.array(t)
+        fO = self.fun(t,self.DO)
+        fR = self.fun(t,self.DR)
+        # self.D is DO for a reduction and DR for an oxidation:
         if self.sign == -1:
-            fOfR = self.fun(t,self.DO)/self.fun(t,self.DR)
+            fD = fO
+            fOfR = fO/fR
         else:
-            fOfR = self.fun(t,self.DR)/self.fun(t,self.DO)
+            fD = fR
+            fOfR = fR/fO
         _ = self.LSV(E)
-        theta=1+self.DODR*fOfR*np.exp(-self.sign*self.n*F*(E-self.E0)/(R*self.T))
-        kappa = self.k*self.a/(self.D*self.fun(t,self.D))
-        self.im0 = self.sign*np.pi*self.n*F*self.D*self.C*self.a*self.fun(t,self.D)
-        i = (self.im0/theta)/(1 + 
-            (np.pi/(kappa*theta))*((2*kappa*theta+
-            3*np.pi)/(4*kappa*theta+3*np.pi**2)))
-        return i + np.random.normal(size=t.size, scale=self.noise)
+        theta=1+self.DODR*fOfR*np.exp(-self.sign*self.n*self.FRT*(E-self.E0))
+        kappa = self.k*self.a/(self.D*fD)
+        self.im0 = self.sign*np.pi*self.n*F*self.D*self.C*self.a*fD
+        kt = kappa*theta
+        i = (self.im0/theta)/(1 + (np.pi/kt)*((2*kt + 3*np.pi)/(4*kt + 3*np.pi**2)))
+        if self.noise:
+            i = i + np.random.normal(size=t.size, scale=self.noise)
+        return i
 
     def fun(self, t, D):
-        s = D*t/self.a**2
-        f1 = 1/np.sqrt(np.pi*s) + 1 + np.sqrt(s/(4*np.pi)) - 3*s/25 + 3*s**(3/2)/226
-        f2 = 4/np.pi + 8/np.sqrt(s*np.pi**5) + 25/(2792*s**(3/2)) - 1/(3880*s**(5/2)) - 1/(4500*s**(7/2))
-        # Fancy if statement using boolean operations:
-        return (s<1.281)*f1 + (s>=1.281)*f2
+        s = D*np.asarray(t, dtype=float)/self.a**2
+        f = np.empty_like(s)
+        # Each expansion is only evaluated where it applies:
+        short = s < 1.281
+        s1 = s[short]
+        sqrt_s = np.sqrt(s1)
+        f[short] = 1/(np.sqrt(np.pi)*sqrt_s) + 1 + sqrt_s/(2*np.sqrt(np.pi)) - 3*s1/25 + 3*s1*sqrt_s/226
+        s2 = s[~short]
+        sqrt_s = np.sqrt(s2)
+        s32 = s2*sqrt_s
+        f[~short] = 4/np.pi + 8/(np.sqrt(np.pi**5)*sqrt_s) + 25/(2792*s32) - 1/(3880*s2*s32) - 1/(4500*s2**2*s32)
+        return f
 
 
 class MicroBand:
@@ -1,3 +1,4 @@
+import numpy as np
 import matplotlib.pyplot as plt
 
 def format(xlab, ylab, legend=False, show=False, fileName=False):
@@ -31,25 +32,28 @@ def plot(x, y, xlab='$E$ / V', ylab='$i$ / A', mark='-', legend=False, fig=1, sh
     '''
     # By default, y should be a list, if it is just a numpy array then
     # convert it into list to be used in the for loop afterwards:
-    if (type(y) != list):
+    if not isinstance(y, (list, tuple)):
         y = [y]
     ny = len(y)
     # Even with multiple plots, the user may want to have the same marker or
     # line stile for each curve, so if it is not a list, convert it into one
-    if (type(mark) != list):
+    if not isinstance(mark, (list, tuple)):
         mark = [mark]*ny
     # Legend can also be just one or a list:
-    if (type(legend) != list):
+    if not isinstance(legend, (list, tuple)):
         legend = [legend]*ny
     plt.figure(fig)
-    for n in range(ny):
-        plt.plot(x, y[n], mark[n], label=legend[n])
+    if ny > 1 and mark.count(mark[0]) == ny and not any(legend):
+        # Same style and no labels, so all curves are drawn in a single call:
+        plt.plot(x, np.transpose(y), mark[0])
+    else:
+        for n in range(ny):
+            plt.plot(x, y[n], mark[n], label=legend[n])
     
     format(xlab, ylab, legend, show, fileName)
 
 
 if __name__ == '__main__':
-    import numpy as np
     x = np.array([1,2,3,4])
     y = [x, x**2, x**3]
     mark = ['-vg', '--b', '-or']
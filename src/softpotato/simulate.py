@@ -7,9 +7,35 @@ T = 298 # K, Temperature
 FRT = F/(R*T)
 
 
+def _explicit(C, surf, bvA, bvB, lamb, DOR):
+    '''
+        Explicit finite differences time loop. Only two time steps are kept:
+        C = [CR, CO] is advanced in place up to the last time step, and the
+        first three points of each profile are stored in surf at every step
+    '''
+    iDOR = 1/DOR
+    prev = C
+    curr = C.copy() # The last point keeps the bulk value in both buffers
+    surf[:,:,0] = C[:,:3]
+    for k in range(1, surf.shape[2]):
+        # Boundary condition, Butler-Volmer:
+        CR1kb = prev[0,1]
+        CO1kb = prev[1,1]
+        curr[0,0] = (CR1kb + bvA[k]*(CO1kb + CR1kb*iDOR))/bvB[k]
+        curr[1,0] = CO1kb + (CR1kb - curr[0,0])*iDOR
+
+        # R and O are updated together in one pass over step k-1:
+        curr[:,1:-1] = prev[:,1:-1] + lamb*(prev[:,2:] - 2*prev[:,1:-1] + 
+                       prev[:,:-2])
+        surf[:,:,k] = curr[:,:3]
+        prev, curr = curr, prev
+    if prev is not C:
+        C[:] = prev
+
+
 class E:
     def __init__(self, wf, n=1, A=0.0314, E0=0, cOb=0, cRb=1e-6, 
-                 DO=1e-5, DR=1e-5, k0=1e8, alpha=0.5):
+                 DO=1e-5, DR=1e-5, k0=1e8, alpha=0.5, dtype=np.float64):
         self.wf = wf
         self.n = n
         self.A = A
@@ -21,9 +47,47 @@ class E:
         self.k0 = k0
         self.alpha = alpha
         self.DOR = DO/DR
+        # Precision of the concentration grid, np.float32 halves the memory
+        # traffic of the time loop. It loses accuracy where the current is
+        # small (early times, foot of the wave): the three point derivative
+        # cancels to float32 rounding, and small currents can be off by a
+        # few % or change sign. Keep np.float64 for log or Tafel analysis:
+        self.dtype = dtype
+
+        # Adimensional potential waveform and Butler-Volmer exponentials,
+        # kept between runs and only updated when E0, n or alpha change:
+        self.eps = np.empty(wf.E.shape)
+        self.expA = np.empty(wf.E.shape)
+        self.expB = np.empty(wf.E.shape)
+        self.key = None
+        self._potential()
+
+    def _potential(self):
+        '''
+            Updates eps, expA and expB in place if E0, n or alpha changed
+            since they were last computed
+        '''
+        key = (self.E0, self.n, self.alpha)
+        if key == self.key:
+            return
+        np.subtract(self.wf.E, self.E0, out=self.eps)
+        self.eps *= self.n*FRT
+        np.multiply(self.eps, -self.alpha, out=self.expA)
+        np.exp(self.expA, out=self.expA)
+        np.multiply(self.eps, 1-self.alpha, out=self.expB)
+        np.exp(self.expB, out=self.expB)
+        self.key = key
+
+    def set_E0(self, E0):
+        '''
+            Changes the standard potential for the next run, for sweeps
+            over E0 that reuse the same waveform
+        '''
+        self.E0 = E0
+        self._potential()
 
     def grid(self):
-        self.nT = np.size(self.wf.t)
+        self.nT = self.wf.t.shape[0]
         self.dT = 1/self.nT
         self.lamb = 0.45
         self.Xmax = 6*np.sqrt(self.nT*self.lamb)
@@ -31,51 +95,56 @@ class E:
         self.nX = int(self.Xmax/self.dX)
 
         ## Discretisation of variables and initialisation
+        # Only the profiles at the current time step are stored, R and O
+        # share one array. surf keeps the points needed for the current:
+        self.C = np.ones([2,self.nX], dtype=self.dtype)
+        self.CR = self.C[0]
+        self.CO = self.C[1]
         if self.cRb == 0: # In case only O present in solution
-            self.CR = np.zeros([self.nT,self.nX])
-            self.CO = np.ones([self.nT,self.nX])
+            self.CR[:] = 0
         else:
-            self.CR = np.ones([self.nT,self.nX])
-            self.CO = np.ones([self.nT,self.nX])*self.cOb/self.cRb
+            self.CO *= self.cOb/self.cRb
+        # One contiguous float64 time series per point, for the current:
+        self.surf = np.empty([2,3,self.nT])
 
-        self.X = np.linspace(0,self.Xmax,self.nX) # Discretisation of distance
-        self.eps = (self.wf.E-self.E0)*self.n*FRT # adimensional potential waveform
         self.delta = np.sqrt(self.DR*self.wf.t[-1]) # cm, diffusion layer thickness
         self.K0 = self.k0*self.delta/self.DR # Normalised standard rate constant
 
 
     def run(self):
         self.grid()
-        for k in range(1,self.nT):
-            # Boundary condition, Butler-Volmer:
-            CR1kb = self.CR[k-1,1]
-            CO1kb = self.CO[k-1,1]
-            self.CR[k,0] = (CR1kb + self.dX*self.K0*np.exp(
-                            -self.alpha*self.eps[k])*(CO1kb + CR1kb/self.DOR))/(
-                       1 + self.dX*self.K0*(np.exp((1-self.alpha)*self.eps[k])+\
-                       np.exp(-self.alpha*self.eps[k])/self.DOR))
-            self.CO[k,0] = CO1kb + (CR1kb - self.CR[k,0])/self.DOR
-
-            self.CR[k,1:-1] = self.CR[k-1,1:-1] + self.lamb*(self.CR[k-1,2:]\
-                            - 2*self.CR[k-1,1:-1] + self.CR[k-1,:-2])
-            self.CO[k,1:-1] = self.CO[k-1,1:-1] + self.lamb*(self.CO[k-1, 2:]\
-                            - 2*self.CO[k-1, 1:-1] + self.CO[k-1,:-2])
+        self._potential()
+        # Butler-Volmer coefficients of the boundary condition at every step:
+        dXK0 = self.dX*self.K0
+        bvA = dXK0*self.expA
+        bvB = 1 + dXK0*(self.expB + self.expA/self.DOR)
+        _explicit(self.C, self.surf, bvA, bvB, self.lamb, self.DOR)
 
         # Denormalising:
         if self.cRb:
-            I = -self.CR[:,2] + 4*self.CR[:,1] - 3*self.CR[:,0]
+            # Three point derivative as one product, -CR2 + 4CR1 - 3CR0:
+            I = np.dot([-3, 4, -1], self.surf[0])
             D = self.DR
             c = self.cRb
         else: # In case only O present in solution
-            I = self.CO[:,2] - 4*self.CO[:,1] + 3*self.CO[:,0]
+            I = np.dot([3, -4, 1], self.surf[1])
             D = self.DO
             c = self.cOb
         self.i = self.n*F*self.A*D*c*I/(2*self.dX*self.delta)
         self.E = self.wf.E
 
-        self.cR = self.CR*self.cRb
-        self.cO = self.CO*self.cOb
-        self.x = self.X*self.delta
+    # Denormalised profiles are only computed when they are requested:
+    @property
+    def cR(self):
+        return self.CR*self.cRb # mol/cm3, R at the end of the waveform
+
+    @property
+    def cO(self):
+        return self.CO*self.cOb # mol/cm3, O at the end of the waveform
+
+    @property
+    def x(self):
+        return np.linspace(0,self.Xmax*self.delta,self.nX) # cm, distance
 
             
 
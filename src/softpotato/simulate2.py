@@ -1,5 +1,5 @@
 import numpy as np
-from scipy.sparse import diags
+from scipy.linalg import solve_banded
 
 '''
     Pending:
@@ -15,6 +15,12 @@ R = 8.315 # J/mol K, Gas constant
 T = 298 # K, Temperature
 FRT = F/(R*T)
 
+# Integer codes for the mechanisms, compared in the time loop:
+MECH = {'E': 0, 'EC': 1, 'C': 2}
+# Integer tags for the species types, set once in Simulate.join:
+SPECIES_E = 0
+SPECIES_C = 1
+
 class E:
     '''
         Defines an E species
@@ -50,7 +56,7 @@ class TGrid:
     def __init__(self, twf, Ewf):
         self.t = twf
         self.E = Ewf
-        self.nT = np.size(self.t) # number of time elements
+        self.nT = self.t.shape[0] # number of time elements
         self.dT = 1/self.nT # adimensional step time
         self.T = twf/twf[-1] # adimensional time
 
@@ -59,46 +65,59 @@ class XGrid:
     '''
         Defines the grid in space
     '''
-    def __init__(self, species, tgrid, Ageo=1):
-        self.lamb = 0.45 # For the algorithm to be stable, lamb = dT/dX^2 < 0.5
+    def __init__(self, species, tgrid, Ageo=1, lamb=0.45):
+        # lamb = dT/dX^2, it has to be < 0.5 for RK4 to be stable. The
+        # implicit solver ('BE') is stable for any lamb, so larger values
+        # can be used for a finer grid:
+        self.lamb = lamb
         self.Xmax = 6*np.sqrt(tgrid.nT*self.lamb) # Infinite distance
         self.dX = np.sqrt(tgrid.dT/self.lamb) # distance increment
         self.nX = int(self.Xmax/self.dX) # number of distance elements
         self.X = np.linspace(0, self.Xmax, self.nX) # Discretisation of distance
+        self.idX2 = 1/self.dX**2 # for the second derivative
         self.Ageo = Ageo
 
         for x in species:
             if isinstance(x, E):
                 ## Discretisation of variables and initialisation
+                # Only the profiles at the current time step are stored:
                 if x.cRb == 0: # In case only O present in solution
-                    x.CR = np.zeros([tgrid.nT, self.nX])
-                    x.CO = np.ones([tgrid.nT, self.nX])
+                    x.CR = np.zeros(self.nX)
+                    x.CO = np.ones(self.nX)
                 else:
-                    x.CR = np.ones([tgrid.nT, self.nX])
-                    x.CO = np.ones([tgrid.nT, self.nX])*x.cOb/x.cRb
+                    x.CR = np.ones(self.nX)
+                    x.CO = np.ones(self.nX)*x.cOb/x.cRb
+                # First three points of CR and CO at every step, for the
+                # current. One contiguous time series per point:
+                x.surf = np.empty([2, 3, tgrid.nT])
 
                 x.eps = (tgrid.E-x.E0)*x.n*FRT # adimensional potential waveform
                 x.delta = np.sqrt(x.DR*tgrid.t[-1]) # cm, diffusion layer thickness
                 x.Ke = x.ks*x.delta/x.DR # Normalised standard rate constant
-                # Construct matrix:
-                Cb = np.ones(self.nX-1) # Cbefore
-                Cp = -2*np.ones(self.nX) # Cpresent
-                Ca = np.ones(self.nX-1) # Cafter
-                x.A = diags([Cb,Cp,Ca], [-1,0,1]).toarray()/(self.dX**2) 
-                x.A[0,:] = np.zeros(self.nX)
-                x.A[0,0] = 1 # Initial condition
+                # Butler-Volmer coefficients at every step, in one block:
+                expA = np.exp(-x.alpha*x.eps)
+                expB = np.exp((1-x.alpha)*x.eps)
+                x.bv = np.empty([2, x.eps.shape[0]])
+                x.bv[0] = self.dX*x.Ke*expA
+                x.bv[1] = 1 + self.dX*x.Ke*(expB + expA/x.DOR)
             elif isinstance(x, C):
-                x.CP = np.zeros([tgrid.nT, self.nX])
+                x.CP = np.zeros(self.nX)
 
 
 class Simulate:
     '''
     '''
-    def __init__(self, species, mech, tgrid, xgrid):
+    def __init__(self, species, mech, tgrid, xgrid, solver='RK4'):
         self.species = species
         self.mech = mech
+        self.mechCode = MECH.get(mech, -1)
         self.tgrid = tgrid
         self.xgrid = xgrid
+        if solver not in ('RK4', 'BE'):
+            raise ValueError("solver must be 'RK4' or 'BE', got %r" % (solver,))
+        self.solver = solver # 'RK4' explicit or 'BE' implicit (backward Euler)
+        self.scratch = np.empty([5, xgrid.nX]) # Runge-Kutta 4 stages
+        self.ab = {} # Banded matrices for BE, one for each rate
 
         self.join(species)
 
@@ -107,55 +126,85 @@ class Simulate:
         nC = self.nC[0]
         sE = self.species[nE]
         sC = self.species[nC]
+        mechCode = self.mechCode
+        if self.solver == 'BE':
+            step = self.BE
+        else:
+            step = self.RK4
+        # Profiles at steps k-1 and k, swapped after every step. The last
+        # point keeps the bulk value:
+        CR = sE.CR
+        CO = sE.CO
+        CRk = np.empty_like(CR)
+        COk = np.empty_like(CO)
+        if mechCode == 1:
+            KcdT = sC.Kc*self.tgrid.dT
+            CP = sC.CP
+            CPk = np.empty_like(CP)
+        # Boundary condition coefficients:
+        bvA, bvB = sE.bv
+        iDOR = 1/sE.DOR
+        sE.surf[:,:,0] = CR[:3], CO[:3]
         for k in range(1, self.tgrid.nT):
             # Boundary condition, Butler-Volmer:
-            CR1kb = sE.CR[k-1,1]
-            CO1kb = sE.CO[k-1,1]
-            sE.CR[k,0] = (CR1kb + self.xgrid.dX*sE.Ke*np.exp(-sE.alpha*sE.eps[k]
-                         )*(CO1kb + CR1kb/sE.DOR))/(1 + self.xgrid.dX*sE.Ke*(
-                         np.exp((1-sE.alpha)*sE.eps[k])+np.exp(
-                         -sE.alpha*sE.eps[k])/sE.DOR))
-            sE.CO[k,0] = CO1kb + (CR1kb - sE.CR[k,0])/sE.DOR
-            # Runge-Kutta 4:
-            sE.CR[k,1:-1] = self.RK4(sE.CR[k-1,:], 'E', sE)[1:-1]
-            if self.mech == 'E':
-                sE.CO[k,1:-1] = self.RK4(sE.CO[k-1,:], 'E', sE)[1:-1]
-            elif self.mech == 'EC':
-                sE.CO[k,1:-1] = self.RK4(sE.CO[k-1,:], 'EC', sE, sC)[1:-1]
-                sC.CP[k,0] = sC.CP[k-1,1]
-                sC.CP[k,1:-1] = self.RK4(sC.CP[k-1,:], 'ECP', sE, sC)[1:-1]
+            CR1kb = CR[1]
+            CO1kb = CO[1]
+            CR0 = (CR1kb + bvA[k]*(CO1kb + CR1kb*iDOR))/bvB[k]
+            CO0 = CO1kb + (CR1kb - CR0)*iDOR
+            step(CR, 0, CRk, CR0)
+            if mechCode == 0: # E
+                step(CO, 0, COk, CO0)
+            elif mechCode == 1: # EC
+                step(CO, -KcdT, COk, CO0)
+                step(CP, KcdT, CPk, CP[1]) # To obtain concentration of P
+                CP, CPk = CPk, CP
+            else:
+                COk[:] = CO
+                COk[0] = CO0
+            CR, CRk = CRk, CR
+            CO, COk = COk, CO
+            sE.surf[:,:,k] = CR[:3], CO[:3]
+        sE.CR = CR
+        sE.CO = CO
+        if mechCode == 1:
+            sC.CP = CP
                 
-        for s in self.species:
-            if isinstance(s, E):
+        for s, kind in zip(self.species, self.kinds):
+            if kind == SPECIES_E:
                 # Denormalising:
                 if s.cRb:
-                    I = -s.CR[:,2] + 4*s.CR[:,1] - 3*s.CR[:,0]
+                    CR = s.surf[0]
+                    I = -CR[2] + 4*CR[1] - 3*CR[0]
                     D = s.DR
                     c = s.cRb
                 else: # In case only O present in solution
-                    I = s.CO[:,2] - 4*s.CO[:,1] + 3*s.CO[:,0]
+                    CO = s.surf[1]
+                    I = CO[2] - 4*CO[1] + 3*CO[0]
                     D = s.DO
                     c = s.cOb
                 self.i = s.n*F*self.xgrid.Ageo*D*c*I/(2*self.xgrid.dX*s.delta)
 
                 #self.cR = s.CR*s.cRb
                 #self.cO = s.CO*s.cOb
-                self.x = self.xgrid.X*s.delta
-            elif isinstance(s, C):
-                self.cP = s.CP#*s.cPb
+            elif kind == SPECIES_C:
+                self.cP = s.CP#*s.cPb # Profile at the last time step
 
-        s.CR = 0 # Empty matrix to free memory
-        s.CO = 0
-        s.CP = 0
+    @property
+    def x(self):
+        # cm, distance, computed only when it is requested:
+        return self.xgrid.X*self.species[self.nE[0]].delta
 
     def join(self, species):
         ns = len(species)
         self.nE = []
         self.nC = []
+        self.kinds = np.full(ns, -1, dtype=np.int8)
         for s in range(ns):
             if isinstance(species[s], E):
+                self.kinds[s] = SPECIES_E
                 self.nE.append(s)
             elif isinstance(species[s], C):
+                self.kinds[s] = SPECIES_C
                 self.nC.append(s)
         # User may only want to simulate an E mechanism:
         if not self.nC:
@@ -168,21 +217,79 @@ class Simulate:
                                      species[self.nE[0]].delta/ \
                                      species[self.nE[0]].DR
 
-    def fun(self, y, mech, species, params):
-        rate = 0
-        if mech == 'EC':
-            rate = - self.tgrid.dT*params.Kc*y
-        elif mech == 'ECP': # To obtain concentration profile of P
-            rate = self.tgrid.dT*params.Kc*y
-        return np.dot(species.A, y) + rate
+    def fun(self, y, rate, out):
+        '''
+            Writes dy/dT into out, rate is the normalised first order rate
+            constant times dT (0 when there is no chemical step)
+        '''
+        # Tridiagonal second derivative, the first row keeps y[0] as it is
+        # given by the boundary condition:
+        idX2 = self.xgrid.idX2
+        out[0] = y[0]
+        np.add(y[:-2], y[2:], out=out[1:-1])
+        out[1:-1] -= 2*y[1:-1]
+        out[1:-1] *= idX2
+        out[-1] = (y[-2] - 2*y[-1])*idX2
+        if rate:
+            out += rate*y
+        return out
+
+    def RK4(self, y, rate, out, y0):
+        '''
+            Explicit Runge-Kutta 4 step from y into out, out[0] is set to
+            the boundary value y0 and out[-1] keeps the bulk value
+        '''
+        dT = self.tgrid.dT
+        # The stages are written into scratch buffers allocated once:
+        k1, k2, k3, k4, yk = self.scratch
+        self.fun(y, rate, k1)
+        np.multiply(k1, dT/2, out=yk)
+        yk += y
+        self.fun(yk, rate, k2)
+        np.multiply(k2, dT/2, out=yk)
+        yk += y
+        self.fun(yk, rate, k3)
+        np.multiply(k3, dT, out=yk)
+        yk += y
+        self.fun(yk, rate, k4)
+        # y + (dT/6)*(k1 + 2*k2 + 2*k3 + k4):
+        k2 += k3
+        k2 *= 2
+        k2 += k1
+        k2 += k4
+        k2 *= dT/6
+        np.add(y, k2, out=out)
+        out[0] = y0
+        out[-1] = y[-1]
+        return out
+
+    def BE(self, y, rate, out, y0):
+        '''
+            Implicit (backward Euler) step from y into out, with y0 and the
+            bulk value y[-1] as Dirichlet conditions
+        '''
+        if rate not in self.ab:
+            self.ab[rate] = self.banded(rate)
+        out[:] = y
+        out[0] = y0
+        out[:] = solve_banded((1,1), self.ab[rate], out, overwrite_b=True,
+                              check_finite=False)
+        return out
 
-    def RK4(self, y, mech, species, params=0):
+    def banded(self, rate):
+        '''
+            Tridiagonal matrix of the backward Euler step in the banded
+            form used by scipy.linalg.solve_banded
+        '''
         dT = self.tgrid.dT
-        k1 = self.fun(y, mech, species, params)
-        k2 = self.fun(y+dT*k1/2, mech, species, params)
-        k3 = self.fun(y+dT*k2/2, mech, species, params)
-        k4 = self.fun(y+dT*k3, mech, species, params)
-        return y + (dT/6)*(k1 + 2*k2 + 2*k3 + k4)
+        lamb = dT*self.xgrid.idX2
+        ab = np.zeros([3, self.xgrid.nX])
+        ab[0,2:] = -lamb # Cafter
+        ab[1,:] = 1 + 2*lamb - dT*rate # Cpresent
+        ab[2,:-2] = -lamb # Cbefore
+        ab[1,0] = 1 # Boundary conditions
+        ab[1,-1] = 1
+        return ab
 
 
 
@@ -39,14 +39,12 @@ class Sweep:
         tsw = Ewin/self.sr # total time for one sweep
         nt = int(Ewin/self.dE)
 
-        self.E = np.array([])
         self.t = np.linspace(0, tsw*self.ns, nt*self.ns)
 
-        for n in range(1, self.ns+1):
-            if (n%2 == 1):
-                self.E = np.append(self.E, np.linspace(self.Eini, self.Efin, nt))
-            else:
-                self.E = np.append(self.E, np.linspace(self.Efin, self.Eini, nt))
+        # One forward and backward cycle, repeated to fill the ns sweeps:
+        Efwd = np.linspace(self.Eini, self.Efin, nt)
+        Ebwd = np.linspace(self.Efin, self.Eini, nt)
+        self.E = np.resize(np.concatenate([Efwd, Ebwd]), nt*self.ns)
 
 class Sweep2:
     """ 
@@ -60,7 +58,7 @@ class Sweep2:
     Efin:   V, final potential [0.5 V]
     sr:     V/s, scan rate [0.1 V/s]
     dE:     V, potential increment [0.01 V]
-    ns:     number of sweeps [2]
+    ns:     number of cycles [2]
 
     ----------
     Returns:
@@ -90,29 +88,30 @@ class Sweep2:
         ntupper = int(((Eupp - Eini)/Ewin)*nt) # Added ntupper and ntlower parameters to allow for asymmetric waveforms
         ntlower = int(((Eini - Elow)/Ewin)*nt)
 
-        self.E = np.array([])
-        self.t = np.linspace(0, tsw*self.ns, nt*self.ns)
-
         if Eini == Eupp or Eini == Elow: # Accomodates for situations in which initial potential is same as uppoer or lower vertex
             segments = 2
         else:
             segments = 3
-            
-        for n in range(1, self.ns+1):
-            if (segments == 3) and (abs(dE) == dE):
-                self.E = np.append(self.E, np.linspace(self.Eini, self.Eupp, ntupper))
-                self.E = np.append(self.E, np.linspace(self.Eupp, self.Elow, nt))
-                self.E = np.append(self.E, np.linspace(self.Elow, self.Eini, ntlower))
-            elif (segments == 3) and (abs(dE) != dE): # When absolute of dE is not equal to dE it means the scan is negative
-                self.E = np.append(self.E, np.linspace(self.Eini, self.Elow, ntlower))
-                self.E = np.append(self.E, np.linspace(self.Elow, self.Eupp, nt))
-                self.E = np.append(self.E, np.linspace(self.Eupp, self.Eini, ntupper))
-            elif (segments == 2) and (Eini == Eupp):
-                self.E = np.append(self.E, np.linspace(self.Eini, self.Elow, nt))
-                self.E = np.append(self.E, np.linspace(self.Elow, self.Eupp, nt))
-            elif (segments == 2) and  (Eini == Elow):
-                self.E = np.append(self.E, np.linspace(self.Eini, self.Eupp, nt))
-                self.E = np.append(self.E, np.linspace(self.Eupp, self.Elow, nt))
+
+        # Every sweep is the same, so one cycle is built and then repeated:
+        if (segments == 3) and (abs(dE) == dE):
+            cycle = [np.linspace(self.Eini, self.Eupp, ntupper),
+                     np.linspace(self.Eupp, self.Elow, nt),
+                     np.linspace(self.Elow, self.Eini, ntlower)]
+        elif (segments == 3) and (abs(dE) != dE): # When absolute of dE is not equal to dE it means the scan is negative
+            cycle = [np.linspace(self.Eini, self.Elow, ntlower),
+                     np.linspace(self.Elow, self.Eupp, nt),
+                     np.linspace(self.Eupp, self.Eini, ntupper)]
+        elif (segments == 2) and (Eini == Eupp):
+            cycle = [np.linspace(self.Eini, self.Elow, nt),
+                     np.linspace(self.Elow, self.Eupp, nt)]
+        elif (segments == 2) and  (Eini == Elow):
+            cycle = [np.linspace(self.Eini, self.Eupp, nt),
+                     np.linspace(self.Eupp, self.Elow, nt)]
+        self.E = np.tile(np.concatenate(cycle), self.ns)
+        # Each cycle goes to both vertices, that is two sweeps. t has one
+        # point per potential:
+        self.t = np.linspace(0, 2*tsw*self.ns, self.E.size)
 
 
 
@@ -149,7 +148,7 @@ class Step:
         self.dt = dt
         self.nt = int(self.ttot/self.dt)
 
-        self.E = np.ones([self.nt])*self.Es
+        self.E = np.full(self.nt, self.Es, dtype=float)
         self.t = np.linspace(dt, self.ttot + dt, self.nt)
 
 
@@ -179,17 +178,24 @@ class Custom:
     """
 
     def __init__(self, wf):
-        n = len(wf)
-        t = np.array([0])
-        E = np.array([0])
-
-        for i in range(n):
-            t = np.concatenate([t,wf[i].t+t[-1]])
-            E = np.concatenate([E,wf[i].E])
-
-        # Remove first data point to prevent repeating time
-        self.t = t[1:]
-        self.E = E[1:]
+        # t and E are filled separately, a waveform is not required to
+        # have the same number of points in both:
+        self.t = np.empty(sum(w.t.size for w in wf))
+        self.E = np.empty(sum(w.E.size for w in wf))
+
+        # Each waveform starts where the previous one ended:
+        tend = 0
+        jt = 0
+        jE = 0
+        for w in wf:
+            nt = w.t.size
+            self.t[jt:jt+nt] = w.t + tend
+            if nt: # An empty waveform leaves the end time as it is
+                tend = self.t[jt+nt-1]
+            jt += nt
+            nE = w.E.size
+            self.E[jE:jE+nE] = w.E
+            jE += nE
         
 
 if __name__ == '__main__':